@@ -1,34 +1,145 @@
-import os
 import streamlit as st
-from agents import Agent, Runner, OpenAIChatCompletionsModel, AsyncOpenAI
-import pandas as pd
+from agents import Agent, Runner, RunConfig, OpenAIChatCompletionsModel, AsyncOpenAI, set_tracing_disabled
+from openai import DefaultAsyncHttpxClient
+from openai.types.responses import ResponseTextDeltaEvent
 from datetime import datetime
 import asyncio
+import httpx
+import hashlib
+import threading
+import time
+from collections import namedtuple
+
+# Default cap on concurrent Groq requests in parallel mode
+MAX_CONCURRENCY = 5
+
+# Seconds between refreshes of the streamed agent output
+STREAM_REFRESH_INTERVAL = 0.1
+
+# Seconds a finished crew's outputs are reused for an identical crew
+CREW_CACHE_TTL = 3600
+
+# Maximum number of finished crews kept for reuse
+CREW_CACHE_MAX_ENTRIES = 100
+
+# Bounds on cached Groq clients (one per API key) and on cached agent configurations
+RESOURCE_CACHE_TTL = 3600
+MODEL_CACHE_MAX_ENTRIES = 20
+AGENT_CACHE_MAX_ENTRIES = 200
+
+# Separator lines used in the downloadable report
+SEP = "=" * 50
+DASH = "-" * 50
+
+# Stands in for the result of a failed agent so the rest of the crew can still be shown
+_Stub = namedtuple("_Stub", "final_output")
+
+# Runs go to Groq, so never export traces (or the Groq key) to OpenAI's tracing endpoint
+set_tracing_disabled(True)
 
 # Add this near the top of the file, after the imports
-if 'download_content' not in st.session_state:
-    st.session_state.download_content = None
+if 'report_parts' not in st.session_state:
+    st.session_state.report_parts = None
+
+@st.cache_resource(show_spinner=False, ttl=RESOURCE_CACHE_TTL, max_entries=MODEL_CACHE_MAX_ENTRIES)
+def get_model(api_key, loop_id):
+    # Cached per API key and event loop so the client's connection pool is reused across
+    # reruns, but never from a loop other than the one its connections were opened on.
+    # HTTP/2 lets concurrent agent requests share one connection to Groq. The timeout
+    # applies to each connect, read, write and pool wait, not to the whole request.
+    http_client = DefaultAsyncHttpxClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        timeout=httpx.Timeout(60.0, connect=10.0)
+    )
+    return OpenAIChatCompletionsModel(
+        model="llama-3.1-8b-instant",
+        openai_client=AsyncOpenAI(
+            api_key=api_key,
+            base_url="https://api.groq.com/openai/v1",
+            http_client=http_client
+        )
+    )
+
+@st.cache_resource(show_spinner=False, ttl=RESOURCE_CACHE_TTL, max_entries=AGENT_CACHE_MAX_ENTRIES)
+def get_agent(name, instructions):
+    # Agents only hold configuration, so unchanged agents are reused across reruns. The model
+    # is passed per run, so cached agents never keep a client or API key alive.
+    return Agent(name=name, instructions=instructions)
+
+@st.cache_resource(show_spinner=False)
+def get_loop():
+    # One long-lived event loop shared by all runs, so the cached client's connections stay usable
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+@st.cache_resource(show_spinner=False)
+def get_crew_cache():
+    # Maps a crew key to (finish time, outputs), shared across reruns and sessions
+    return {}
+
+def crew_cache_key(agent_configs, human_input, groq_api_key, parallel):
+    crew = (
+        parallel,
+        tuple((config["name"], config["instructions"]) for config in agent_configs),
+        human_input,
+        hashlib.sha256(groq_api_key.encode()).hexdigest()
+    )
+    return hashlib.sha256(repr(crew).encode()).hexdigest()
+
+def store_crew_outputs(crew_cache, key, outputs):
+    now = time.time()
+    for cached_key, (finished, _) in list(crew_cache.items()):
+        if now - finished >= CREW_CACHE_TTL:
+            crew_cache.pop(cached_key, None)
+    # Entries are kept in insertion order, so the oldest crews are dropped first
+    crew_cache.pop(key, None)
+    while len(crew_cache) >= CREW_CACHE_MAX_ENTRIES:
+        crew_cache.pop(next(iter(crew_cache), None), None)
+    crew_cache[key] = (now, outputs)
 
-async def handle_crew_creation(agent_configs, human_input, groq_api_key):
+def format_agent_body(instructions, output):
+    # One markdown element per agent keeps the number of frontend messages down
+    return f"**Task:**\n\n{instructions}\n\n**Output:**\n\n{output}"
+
+def build_report(report):
+    ts = report["created_at"].strftime("%Y-%m-%d %H:%M:%S")
+    parts = [f"""AUTONOMOUS CREW BUILDER - COMPLETE REPORT
+{SEP}
+
+PART 1: CREW CONFIGURATION
+{SEP}
+Timestamp: {ts}
+
+Additional Context:
+{report["human_input"]}
+
+Agent Configurations:
+"""]
+    for i, config in enumerate(report["configs"]):
+        parts.append(f"\nAgent {i+1}: {config['name']}\nInstructions:\n{config['instructions']}\n{DASH}\n")
+
+    parts.append(f"""
+{SEP}
+PART 2: CREW RESULTS
+{SEP}
+Timestamp: {ts}
+
+Results by Agent:
+""")
+    for i, output in enumerate(report["outputs"]):
+        parts.append(f"\nAgent {i+1}: {report['configs'][i]['name']}\nOutput:\n{output}\n{DASH}\n")
+    return "".join(parts)
+
+def handle_crew_creation(agent_configs, human_input, groq_api_key, parallel=False, max_concurrency=MAX_CONCURRENCY):
     if not groq_api_key:
         st.error("Please enter your GROQ API key in the sidebar!")
         return
 
     try:
         with st.spinner("Creating and running your crew..."):
-            os.environ["OPENAI_API_KEY"] = groq_api_key
-            
-            model = OpenAIChatCompletionsModel(
-                model="llama-3.1-8b-instant",
-                openai_client=AsyncOpenAI(base_url="https://api.groq.com/openai/v1")
-            )
-
-            tasklist, results = await create_and_run_crew(agent_configs, human_input, model)
-            
-            if tasklist is None:
-                return
-
-            # Display results in an organized way
+            # Lay out the results up front so agent output can be streamed into it
             with results_container:
                 st.markdown('<h3 class="section-header">Results</h3>', unsafe_allow_html=True)
                 
@@ -36,87 +147,153 @@ async def handle_crew_creation(agent_configs, human_input, groq_api_key):
                 results_tab1, results_tab2 = st.tabs(["Detailed Output", "Summary"])
                 
                 with results_tab1:
-                    for i, result in enumerate(results):
-                        with st.expander(f"Agent {i+1}: {agent_configs[i]['name']}", expanded=True):
-                            st.markdown("**Task:**")
-                            st.write(agent_configs[i]['instructions'])
-                            st.markdown("**Output:**")
-                            st.write(result.final_output)
+                    placeholders = []
+                    output_placeholders = []
+                    for i, config in enumerate(agent_configs):
+                        with st.expander(f"Agent {i+1}: {config['name']}", expanded=True):
+                            # While streaming, only the output slot is redrawn; the task is sent once
+                            placeholder = st.empty()
+                            with placeholder.container():
+                                st.markdown(format_agent_body(config['instructions'], ""))
+                                output_placeholders.append(st.empty())
+                            placeholders.append(placeholder)
+
+            # Reuse the outputs of an identical crew that finished recently
+            crew_cache = get_crew_cache()
+            key = crew_cache_key(agent_configs, human_input, groq_api_key, parallel)
+            cached = crew_cache.get(key)
+            if cached is not None and time.time() - cached[0] < CREW_CACHE_TTL:
+                outputs = cached[1]
+            else:
+                outputs, errors = run_crew(agent_configs, human_input, groq_api_key, output_placeholders, parallel, max_concurrency)
+                if outputs is None:
+                    return
+                if not errors:
+                    store_crew_outputs(crew_cache, key, outputs)
+
+            # Display results in an organized way
+            with results_container:
+                for i, output in enumerate(outputs):
+                    placeholders[i].markdown(format_agent_body(agent_configs[i]['instructions'], output))
                 
                 with results_tab2:
-                    # Create a summary DataFrame
+                    # Create a summary table
                     summary_data = []
-                    for i, result in enumerate(results):
+                    for i, output in enumerate(outputs):
                         summary_data.append({
                             "Agent": f"{i+1}: {agent_configs[i]['name']}",
                             "Instructions": agent_configs[i]['instructions'],
-                            "Output": result.final_output
+                            "Output": output
                         })
-                    summary_df = pd.DataFrame(summary_data)
-                    st.dataframe(summary_df)
+                    st.table(summary_data)
 
-            # Generate the report content
-            combined_text = f"""AUTONOMOUS CREW BUILDER - COMPLETE REPORT
-{'='*50}
+            # Store only the pieces of the report; the text is rebuilt from them on every
+            # rerun while results exist, since the Download tab renders on each script run
+            st.session_state.report_parts = {
+                "created_at": datetime.now(),
+                "human_input": human_input,
+                "configs": agent_configs,
+                "outputs": outputs
+            }
+    except Exception as e:
+        st.error(f"An error occurred while creating the crew: {str(e)}")
+        st.error("Please check your GROQ API key and try again.")
 
-PART 1: CREW CONFIGURATION
-{'='*50}
-Timestamp: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+def run_crew(agent_configs, human_input, groq_api_key, output_placeholders, parallel, max_concurrency):
+    loop = get_loop()
+    agentlist = [get_agent(config["name"], config["instructions"]) for config in agent_configs]
+    run_config = RunConfig(model=get_model(groq_api_key, id(loop)))
+    streams = [[] for _ in agent_configs]
+    future = asyncio.run_coroutine_threadsafe(
+        create_and_run_crew(agentlist, human_input, streams, run_config, parallel, max_concurrency),
+        loop
+    )
 
-Additional Context:
-{human_input}
+    # Streamlit elements can only be updated from the script thread, so poll the streams here
+    rendered = [0] * len(streams)
+    try:
+        while not future.done():
+            for i, chunks in enumerate(streams):
+                if len(chunks) != rendered[i]:
+                    rendered[i] = len(chunks)
+                    output_placeholders[i].markdown("".join(chunks))
+            time.sleep(STREAM_REFRESH_INTERVAL)
+    finally:
+        # A stop or rerun interrupts this loop; don't leave the crew running on the shared loop
+        if not future.done():
+            future.cancel()
 
-Agent Configurations:
-"""
-            for i, config in enumerate(agent_configs):
-                combined_text += f"\nAgent {i+1}: {config['name']}\n"
-                combined_text += f"Instructions:\n{config['instructions']}\n"
-                combined_text += "-" * 50 + "\n"
-
-            combined_text += f"""
-{'='*50}
-PART 2: CREW RESULTS
-{'='*50}
-Timestamp: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    results, errors = future.result()
+    for error in errors:
+        st.error(error)
 
-Results by Agent:
-"""
-            for i, result in enumerate(results):
-                combined_text += f"\nAgent {i+1}: {agent_configs[i]['name']}\n"
-                combined_text += f"Output:\n{result.final_output}\n"
-                combined_text += "-" * 50 + "\n"
-            
-            # Store in session state
-            st.session_state.download_content = combined_text
-    except Exception as e:
-        st.error(f"An error occurred while creating the crew: {str(e)}")
-        st.error("Please check your GROQ API key and try again.")
+    if results is None:
+        return None, errors
+    return [result.final_output for result in results], errors
+
+async def stream_agent(agent, prompt, chunks, run_config):
+    # Collect tokens as they arrive so they can be shown before the full completion
+    result = Runner.run_streamed(agent, prompt, run_config=run_config)
+    async for event in result.stream_events():
+        if event.type == "raw_response_event" and isinstance(event.data, ResponseTextDeltaEvent):
+            chunks.append(event.data.delta)
+    return result
+
+async def create_and_run_crew(agentlist, human_input, streams, run_config, parallel=False, max_concurrency=MAX_CONCURRENCY):
+    errors = []
+
+    if parallel:
+        # Agents work independently on the user input, so their calls can overlap,
+        # but keep at most max_concurrency requests in flight to stay under Groq rate limits
+        sem = asyncio.Semaphore(max_concurrency)
+
+        # Agents with identical instructions receive identical prompts, so they share one call
+        calls = {}
+
+        async def call_agent(agent, prompt, chunks):
+            async with sem:
+                return await stream_agent(agent, prompt, chunks, run_config)
+
+        async def run_one(key, agent, prompt, chunks):
+            if key not in calls:
+                calls[key] = asyncio.ensure_future(call_agent(agent, prompt, chunks))
+            return await calls[key]
+
+        keys = [
+            hashlib.sha1(f"{agent.instructions}\n{human_input}".encode()).hexdigest()
+            for agent in agentlist
+        ]
+        # Duplicates share the first agent's stream, so every placeholder of a shared call fills in live
+        first_index = {}
+        for i, key in enumerate(keys):
+            streams[i] = streams[first_index.setdefault(key, i)]
+        # A failed agent must not abort the others, so collect exceptions alongside the results
+        results = await asyncio.gather(
+            *[run_one(key, agent, human_input, chunks) for key, agent, chunks in zip(keys, agentlist, streams)],
+            return_exceptions=True
+        )
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                errors.append(f"Agent {i+1} failed: {str(result)}")
+                results[i] = _Stub(final_output=f"[error: {result}]")
+        return results, errors
 
-async def create_and_run_crew(agent_configs, human_input, model):
-    agentlist = []
     results = []
     
-    for i in range(len(agent_configs)):
+    for i, agent in enumerate(agentlist):
         try:
-            agent = Agent(
-                name=agent_configs[i]["name"],
-                instructions=agent_configs[i]["instructions"],
-                model=model
-            )
-            agentlist.append(agent)
-            
             # Run the agent with the task
             if i == 0:  
-                result = await Runner.run(agent, human_input)
+                result = await stream_agent(agent, human_input, streams[i], run_config)
             else:
-                result = await Runner.run(agent, results[i-1].final_output)
+                result = await stream_agent(agent, results[i-1].final_output, streams[i], run_config)
             results.append(result)
             
         except Exception as e:
-            st.error(f"Error creating agent: {str(e)}")
-            return None, None
+            errors.append(f"Error running agent: {str(e)}")
+            return None, errors
 
-    return agentlist, results
+    return results, errors
 
 # Set page config
 st.set_page_config(
@@ -157,6 +334,13 @@ st.markdown("""
 with st.sidebar:
     st.title("⚙️ Settings")
     groq_api_key = st.text_input('Enter your GROQ API key', type='password')
+    max_concurrency = st.number_input(
+        'Max Concurrent Requests',
+        min_value=1,
+        max_value=20,
+        value=MAX_CONCURRENCY,
+        help="Maximum number of agents that call the GROQ API at the same time in parallel mode. Raise this if your GROQ tier allows higher rate limits."
+    )
     st.markdown("---")
     st.markdown("""
         ### How to use this app:
@@ -199,6 +383,12 @@ with tab2:
         value=1,
         help="Select how many agents you want in your crew"
     )
+    execution_mode = st.radio(
+        'Execution Mode',
+        ["Sequential", "Parallel"],
+        horizontal=True,
+        help="Sequential passes each agent's output to the next agent. Parallel runs all agents independently on the user input at the same time."
+    )
 
     # Create a container for agent configurations
     agent_configs = []
@@ -219,12 +409,12 @@ with tab2:
 
     # Create Crew button (moved inside tab2)
     if st.button('🚀 Create Crew', type="primary"):
-        asyncio.run(handle_crew_creation(agent_configs, human_input, groq_api_key))
+        handle_crew_creation(agent_configs, human_input, groq_api_key, execution_mode == "Parallel", max_concurrency)
 
 # Download tab content (moved outside of results container)
 with tab3:
     st.markdown('<h3 class="section-header">Download Report</h3>', unsafe_allow_html=True)
-    if st.session_state.download_content is None:
+    if st.session_state.report_parts is None:
         st.markdown("""
         After creating and running your crew, you can download the complete report here.
         
@@ -249,7 +439,7 @@ with tab3:
         
         st.download_button(
             label="📥 Download Complete Report",
-            data=st.session_state.download_content,
-            file_name=f"crew_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+            data=build_report(st.session_state.report_parts),
+            file_name=f"crew_report_{st.session_state.report_parts['created_at'].strftime('%Y%m%d_%H%M%S')}.txt",
             mime="text/plain"
         ) 
\ No newline at end of file